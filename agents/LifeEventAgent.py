@@ -1,29 +1,42 @@
 """Simple logic for handling major life events."""
 
-from typing import Dict, Any
-from .openai_utils import generate_response
+from typing import Dict, Any, Optional
+from .openai_utils import generate_response, to_prompt_json, MISSING_DETAILS
 
 
 class LifeEventAgent:
     """Processes life events found in the user input."""
 
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Return a short plan for the detected life event."""
+    max_tokens = 100
 
+    def build_prompt(self, state: Dict[str, Any]) -> Optional[str]:
         user_input = state.get("input", "")
         context = state.get("context", {}) or {}
+        if not user_input:
+            return None
 
-        prompt = (
+        return (
             "You are a helpful financial assistant. Provide a concise plan or "
             "set of tips for the following user request. If a specific life "
             "event is mentioned, tailor the advice accordingly. Limit the "
             "response to no more than three sentences.\nRequest: "
-            f"{user_input}\nContext: {context}"
+            f"{user_input}\nContext: {to_prompt_json(context)}"
         )
-        result = generate_response(prompt, max_tokens=100)
+
+    def format_result(self, result: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        context = state.get("context", {}) or {}
 
         return {
             "result": result,
             "confidence_score": 0.85,
             "metadata": {"context": context},
         }
+
+    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a short plan for the detected life event."""
+
+        prompt = self.build_prompt(state)
+        if prompt is None:
+            return self.format_result(MISSING_DETAILS, state)
+        result = generate_response(prompt, max_tokens=self.max_tokens)
+        return self.format_result(result, state)
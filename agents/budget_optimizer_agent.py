@@ -1,26 +1,38 @@
 """Simple budget optimization logic."""
 
-from typing import Dict, Any
-from .openai_utils import generate_response
+from typing import Dict, Any, Optional
+from .openai_utils import generate_response, to_prompt_json, MISSING_DETAILS
 
 
 class BudgetOptimizerAgent:
     """Suggests a basic allocation for disposable income."""
 
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    max_tokens = 80
+
+    def build_prompt(self, state: Dict[str, Any]) -> Optional[str]:
         context = state.get("context", {}) or {}
-        amount = context.get("amount")
+        if not context.get("amount"):
+            return None
 
-        prompt = (
+        return (
             "You are a budgeting expert. Provide a short recommendation for how "
             "to allocate a user's disposable income. Include specific dollar "
             "amounts if provided. Limit to two sentences.\nContext: "
-            f"{context}"
+            f"{to_prompt_json(context)}"
         )
-        result = generate_response(prompt, max_tokens=80)
+
+    def format_result(self, result: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        context = state.get("context", {}) or {}
 
         return {
             "result": result,
             "confidence_score": 0.82,
             "metadata": {"context": context},
         }
+
+    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = self.build_prompt(state)
+        if prompt is None:
+            return self.format_result(MISSING_DETAILS, state)
+        result = generate_response(prompt, max_tokens=self.max_tokens)
+        return self.format_result(result, state)
@@ -0,0 +1,15 @@
+"""Settings read from the environment and ``.env`` once at import.
+
+Values in ``.env`` take precedence over variables already set in the shell.
+``OPENAI_API_KEY`` is still looked up per call by :mod:`agents.openai_utils`
+so it can be set after the agents are imported."""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+PLAID_CLIENT_ID = os.getenv("PLAID_CLIENT_ID")
+PLAID_SECRET = os.getenv("PLAID_SECRET")
+ACCESS_TOKEN = os.getenv("ACCESS_TOKEN")
@@ -1,12 +1,19 @@
 """Converts technical results into simple language."""
 
 from typing import Dict, Any
-from .openai_utils import generate_response
+from .openai_utils import generate_response_streaming
 
 
 class ExplainerAgent:
     """Provides user-friendly explanations of agent results."""
 
+    max_tokens = 60
+    # Used when the explanation is requested alongside the other agents' tasks
+    combined_task = (
+        "Explain the combined answers to the other tasks in very simple "
+        "language in one sentence."
+    )
+
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         final_result = state.get("final_result", "")
 
@@ -15,7 +22,7 @@ class ExplainerAgent:
                 "Explain the following in very simple language in one sentence:\n"
                 f"{final_result}"
             )
-            explanation = generate_response(prompt, max_tokens=60)
+            explanation = generate_response_streaming(prompt, max_tokens=self.max_tokens)
         else:
             explanation = "Unable to generate an explanation."
 
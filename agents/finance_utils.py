@@ -1,47 +1,73 @@
-from collections import defaultdict
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _transactions_frame(transactions: List[Dict[str, Any]], require_name: bool) -> pd.DataFrame:
+    """Return transactions with a date (and name) as columns plus a month key.
+
+    The month key is ``year * 12 + month - 1`` so consecutive months are
+    consecutive integers."""
+    df = pd.DataFrame(transactions, columns=["name", "amount", "date"])
+    required = ["name", "date"] if require_name else ["date"]
+    df = df.dropna(subset=required)
+    for column in required:
+        df = df[df[column].astype(bool)]
+    dates = df["date"].astype(str)
+    df = df.assign(
+        amount=pd.to_numeric(df["amount"], errors="coerce").fillna(0.0),
+        month=dates.str.slice(0, 4).astype(np.int32) * 12 + dates.str.slice(5, 7).astype(np.int32) - 1,
+    )
+    return df
+
+
+def _month_offsets(months: pd.Series) -> Tuple[np.ndarray, int]:
+    """Return each row's month relative to the earliest and the span in months."""
+    offsets = (months - months.min()).to_numpy()
+    return offsets, int(offsets.max()) + 1
+
+
+def _monthly_totals(
+    group_ids: np.ndarray, month_ids: np.ndarray, amounts: np.ndarray, n_groups: int, n_months: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return each group's total amount and the number of months it appears in.
+
+    Every row lands in one ``group * n_months + month`` cell, so both sums are
+    a single linear ``bincount`` pass with no per-row Python work."""
+    cells = group_ids * n_months + month_ids
+    size = n_groups * n_months
+    totals = np.bincount(cells, weights=amounts, minlength=size).reshape(n_groups, n_months)
+    present = np.bincount(cells, minlength=size).reshape(n_groups, n_months) > 0
+    return totals.sum(axis=1), present.sum(axis=1)
 
 
 def summarize_recurring_expenses(transactions: Optional[List[Dict[str, Any]]]) -> Dict[str, float]:
     """Return average monthly cost for recurring payees."""
-    recurring = {}
     if not transactions:
-        return recurring
-    grouped = defaultdict(list)
-    for tx in transactions:
-        name = tx.get("name")
-        if not name:
-            continue
-        amount = abs(tx.get("amount", 0))
-        date = tx.get("date")
-        if not date:
-            continue
-        grouped[name].append((date, amount))
-    for name, entries in grouped.items():
-        months = defaultdict(float)
-        for date, amount in entries:
-            month = date[:7]
-            months[month] += amount
-        if len(months) >= 2:
-            avg = sum(months.values()) / len(months)
-            recurring[name] = avg
-    return recurring
+        return {}
+    df = _transactions_frame(transactions, require_name=True)
+    if df.empty:
+        return {}
+    name_ids, names = pd.factorize(df["name"])
+    month_ids, n_months = _month_offsets(df["month"])
+    totals, counts = _monthly_totals(
+        name_ids, month_ids, df["amount"].abs().to_numpy(dtype=np.float64), len(names), n_months
+    )
+    recurring = counts >= 2
+    return dict(zip(names[recurring], (totals[recurring] / counts[recurring]).tolist()))
 
 
 def derive_monthly_income(transactions: Optional[List[Dict[str, Any]]]) -> float:
     """Estimate average monthly income from positive transactions."""
     if not transactions:
         return 0.0
-    monthly = defaultdict(float)
-    for tx in transactions:
-        amount = tx.get("amount", 0)
-        if amount > 0:
-            date = tx.get("date")
-            if not date:
-                continue
-            month = date[:7]
-            monthly[month] += amount
-    if not monthly:
+    df = _transactions_frame(transactions, require_name=False)
+    df = df[df["amount"] > 0]
+    if df.empty:
         return 0.0
-    return sum(monthly.values()) / len(monthly)
+    month_ids, n_months = _month_offsets(df["month"])
+    totals, counts = _monthly_totals(
+        np.zeros(len(df), dtype=np.intp), month_ids, df["amount"].to_numpy(dtype=np.float64), 1, n_months
+    )
+    return float(totals[0] / counts[0])
@@ -5,17 +5,83 @@ transactions using Plaid. When holdings and expenses are provided it
 calculates available cash flow and adjusts recommendations to account
 for existing assets."""
 
-from typing import Dict, Any
-import os
-from .openai_utils import generate_response, generate_json
-from datetime import datetime, timedelta
-from .plaid_service import (
-    fetch_account_balance,
-    fetch_investment_holdings,
-    fetch_recent_transactions,
-)
+from typing import Dict, Any, Optional, Tuple
+import threading
+from functools import lru_cache
+from cachetools import TTLCache
+from .openai_utils import generate_templated_response, generate_json
+from datetime import date, datetime, timedelta
+from .config import ACCESS_TOKEN
+from .plaid_service import fetch_all
 from .finance_utils import summarize_recurring_expenses, derive_monthly_income
 
+DEFAULT_RISK = "medium"
+RISK_SCORES = {"low": 0.4, "medium": 0.6, "high": 0.8}
+STOCK_TYPES = frozenset({"equity", "etf", "stock"})
+
+
+@lru_cache(maxsize=256)
+def _allocation(risk: str, horizon: Optional[int]) -> Tuple[float, float, float]:
+    """Return heuristic (stocks, bonds, cash) fractions for a risk and horizon."""
+    risk_score = RISK_SCORES.get(risk, 0.6)
+    time_score = min(horizon / 30, 1.0) if horizon else 0.5
+    stock_pct = 0.3 + 0.6 * (0.5 * risk_score + 0.5 * time_score)
+    cash_pct = 0.1 if horizon and horizon < 5 else 0.05
+    bond_pct = max(0.0, 1.0 - stock_pct - cash_pct)
+    return stock_pct, bond_pct, cash_pct
+
+
+@lru_cache(maxsize=1)
+def _date_window(today_ordinal: int) -> Tuple[str, str]:
+    """Return ISO start/end dates of the 90-day transaction window."""
+    end_date = date.fromordinal(today_ordinal)
+    start_date = end_date - timedelta(days=90)
+    return start_date.isoformat(), end_date.isoformat()
+
+
+# The model's allocation only depends on (risk, horizon), so reuse it for a day
+_llm_allocations: TTLCache = TTLCache(maxsize=256, ttl=86400)
+_llm_allocations_lock = threading.Lock()
+
+
+def _llm_allocation(risk: str, horizon: Optional[int]) -> Dict[str, Any]:
+    """Return the model's suggested allocation percentages, or {} on failure."""
+    key = (risk, horizon)
+    with _llm_allocations_lock:
+        alloc = _llm_allocations.get(key)
+    if alloc is None:
+        allocation_prompt = (
+            "Suggest portfolio allocation percentages for stocks, bonds and "
+            "cash given a risk tolerance of "
+            f"{risk} and an investment horizon of {horizon or 'unknown'} years."
+            " Respond only with JSON: {\"stocks\": int, \"bonds\": int, \"cash\": int}"
+        )
+        alloc = generate_json(allocation_prompt, max_tokens=60)
+        # Failures are not cached so the next request tries again
+        if alloc:
+            with _llm_allocations_lock:
+                _llm_allocations[key] = alloc
+    return alloc
+
+
+INVEST_AMOUNT_TEMPLATE = (
+    "You are an investment advisor. Provide a concise recommendation in two "
+    "sentences for investing ${invest_amount}: ${stocks} in stocks, ${bonds} "
+    "in bonds and ${cash} in cash. Current balance: {balance}. Goal: {goal}. "
+    "ESG preference: {esg}."
+)
+MONTHLY_CONTRIBUTION_TEMPLATE = (
+    "Advise the user on monthly investment contributions. Respond in two "
+    "sentences. They have ${monthly_available} available each month, split "
+    "as ${stocks} in stocks, ${bonds} in bonds and ${cash} in cash. Their "
+    "current allocation is {current_stocks}% stocks, {current_bonds}% bonds "
+    "and {current_cash}% cash."
+)
+GENERIC_ALLOCATION_TEMPLATE = (
+    "Suggest a generic investment allocation in one sentence for a target of "
+    "{stocks}% stocks, {bonds}% bonds and {cash}% cash."
+)
+
 
 class InvestmentAgent:
     """Provides a basic portfolio recommendation."""
@@ -28,22 +94,20 @@ class InvestmentAgent:
         include_expenses = context.get("include_expenses", False)
         override_expenses = context.get("override_fixed_expenses", {}) or {}
 
-        risk = context.get("risk_tolerance", "medium")
+        risk = context.get("risk_tolerance", DEFAULT_RISK)
         goal = context.get("goal")
         esg = context.get("esg", False)
         timeframe = context.get("timeframe")
 
-        access_token = os.getenv("ACCESS_TOKEN") if execute_plaid else None
-        starting_balance = fetch_account_balance(access_token) if access_token else None
-        current_holdings = fetch_investment_holdings(access_token) if access_token and include_holdings else []
-
+        access_token = ACCESS_TOKEN if execute_plaid else None
+        starting_balance = None
+        current_holdings = []
         transactions = []
-        if access_token and include_expenses:
-            end_date = datetime.utcnow().date()
-            start_date = end_date - timedelta(days=90)
-            transactions = fetch_recent_transactions(
-                access_token, start_date.isoformat(), end_date.isoformat()
-            ) or []
+        if access_token:
+            window = _date_window(datetime.utcnow().toordinal()) if include_expenses else None
+            starting_balance, current_holdings, transactions = fetch_all(
+                access_token, include_holdings, window
+            )
         fixed_expenses = summarize_recurring_expenses(transactions)
         fixed_expenses.update(override_expenses)
         monthly_income = derive_monthly_income(transactions)
@@ -64,38 +128,30 @@ class InvestmentAgent:
             except (ValueError, TypeError):
                 horizon = None
 
-        allocation_prompt = (
-            "Suggest portfolio allocation percentages for stocks, bonds and "
-            "cash given a risk tolerance of "
-            f"{risk} and an investment horizon of {horizon or 'unknown'} years."
-            " Respond only with JSON: {\"stocks\": int, \"bonds\": int, \"cash\": int}"
-        )
-        alloc = generate_json(allocation_prompt, max_tokens=60)
+        # The heuristic is the primary path. The model is only consulted on
+        # request, and not when neither risk nor horizon was given.
+        defaults = risk == DEFAULT_RISK and horizon is None
+        use_llm = context.get("use_llm_allocation", False) and not defaults
+        alloc = _llm_allocation(risk, horizon) if use_llm else None
         if alloc:
             stock_pct = alloc.get("stocks", 60) / 100
             bond_pct = alloc.get("bonds", 30) / 100
             cash_pct = alloc.get("cash", 10) / 100
         else:
             # fallback heuristic
-            risk_map = {"low": 0.4, "medium": 0.6, "high": 0.8}
-            risk_score = risk_map.get(risk, 0.6)
-            time_score = min(horizon / 30, 1.0) if horizon else 0.5
-            stock_pct = 0.3 + 0.6 * (0.5 * risk_score + 0.5 * time_score)
-            cash_pct = 0.1 if horizon and horizon < 5 else 0.05
-            bond_pct = max(0.0, 1.0 - stock_pct - cash_pct)
+            stock_pct, bond_pct, cash_pct = _allocation(risk, horizon)
 
         # Compute portfolio context if holdings are available
-        total_portfolio_value = (
-            (starting_balance or 0) + sum(h.get("market_value", 0) for h in current_holdings)
-        )
-        current_stock_value = sum(
-            h.get("market_value", 0)
-            for h in current_holdings
-            if str(h.get("type")).lower() in ["equity", "etf", "stock"]
-        )
-        current_bond_value = sum(
-            h.get("market_value", 0) for h in current_holdings if str(h.get("type")).lower() == "bond"
-        )
+        total_portfolio_value = starting_balance or 0
+        current_stock_value = current_bond_value = 0
+        for h in current_holdings:
+            market_value = h.get("market_value", 0)
+            holding_type = str(h.get("type")).lower()
+            total_portfolio_value += market_value
+            if holding_type in STOCK_TYPES:
+                current_stock_value += market_value
+            elif holding_type == "bond":
+                current_bond_value += market_value
         current_cash_value = starting_balance or 0
         current_stock_pct = current_stock_value / total_portfolio_value if total_portfolio_value else 0
         current_bond_pct = current_bond_value / total_portfolio_value if total_portfolio_value else 0
@@ -103,55 +159,38 @@ class InvestmentAgent:
 
 
         if amount is not None:
-            stocks = amount * stock_pct
-            bonds = amount * bond_pct
-            cash = amount * cash_pct
             info = {
                 "invest_amount": amount,
-                "stocks": stocks,
-                "bonds": bonds,
-                "cash": cash,
-                "balance": starting_balance,
-                "goal": goal,
+                "stocks": amount * stock_pct,
+                "bonds": amount * bond_pct,
+                "cash": amount * cash_pct,
+                "balance": starting_balance if starting_balance is not None else "unknown",
+                "goal": goal or "none",
                 "esg": esg,
             }
-            prompt = (
-                "You are an investment advisor. Using the following context, "
-                "provide a concise recommendation in two sentences:\n" f"{info}"
-            )
-            result = generate_response(prompt, max_tokens=120)
+            result = generate_templated_response(INVEST_AMOUNT_TEMPLATE, info, max_tokens=120)
         elif available_for_investment is not None:
-            stocks = available_for_investment * stock_pct
-            bonds = available_for_investment * bond_pct
-            cash = available_for_investment * cash_pct
             info = {
                 "monthly_available": available_for_investment,
-                "stocks": stocks,
-                "bonds": bonds,
-                "cash": cash,
-                "current_allocation": {
-                    "stocks": current_stock_pct,
-                    "bonds": current_bond_pct,
-                    "cash": current_cash_pct,
-                },
+                "stocks": available_for_investment * stock_pct,
+                "bonds": available_for_investment * bond_pct,
+                "cash": available_for_investment * cash_pct,
+                "current_stocks": round(current_stock_pct * 100),
+                "current_bonds": round(current_bond_pct * 100),
+                "current_cash": round(current_cash_pct * 100),
             }
-            prompt = (
-                "Advise the user on monthly investment contributions. "
-                "Respond in two sentences:\n" f"{info}"
+            result = generate_templated_response(
+                MONTHLY_CONTRIBUTION_TEMPLATE, info, max_tokens=120
             )
-            result = generate_response(prompt, max_tokens=120)
         else:
             info = {
-                "target_allocation": {
-                    "stocks": stock_pct,
-                    "bonds": bond_pct,
-                    "cash": cash_pct,
-                }
+                "stocks": round(stock_pct * 100),
+                "bonds": round(bond_pct * 100),
+                "cash": round(cash_pct * 100),
             }
-            prompt = (
-                "Suggest a generic investment allocation in one sentence:\n" f"{info}"
+            result = generate_templated_response(
+                GENERIC_ALLOCATION_TEMPLATE, info, max_tokens=80
             )
-            result = generate_response(prompt, max_tokens=80)
 
         metadata = {
             "amount": amount,
@@ -1,6 +1,87 @@
 import os
-import json
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
 import openai
+import orjson
+
+# Loads .env so OPENAI_API_KEY is visible to the lookups below
+from . import config  # noqa: F401
+
+CHAT_MODEL = "gpt-3.5-turbo"
+# A bare "." would also stop inside amounts such as "$5.50"
+SENTENCE_STOPS = (". ", "\n")
+# Returned instead of calling the model when a request has nothing to act on
+MISSING_DETAILS = "Please provide more details."
+# Tokens reserved per section of a JSON-mode reply for its key, quotes,
+# separators and escapes, on top of the answer itself
+JSON_SECTION_OVERHEAD = 20
+
+
+class TemplateCache:
+    """Stores response skeletons for prompts that differ only in numbers.
+
+    A skeleton is a completion written against ``{slot}`` placeholders
+    instead of concrete values, so it can be reused for any call sharing
+    the same template, non-numeric values and token limit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._skeletons: Dict[str, str] = {}
+
+    @staticmethod
+    def key(template: str, fixed: Dict[str, Any], slots: List[str], max_tokens: int) -> str:
+        """Return the hash identifying a template and its fixed values."""
+        parts = [template, repr(sorted(fixed.items())), repr(sorted(slots)), str(max_tokens)]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._skeletons.get(key)
+
+    def put(self, key: str, skeleton: str) -> None:
+        with self._lock:
+            self._skeletons[key] = skeleton
+
+
+_template_cache = TemplateCache()
+
+SKELETON_INSTRUCTIONS = (
+    "Write the answer so it reads naturally for any values. Refer to every "
+    "value shown in curly braces by copying its placeholder exactly, e.g. "
+    "{name}, and do not use curly braces for anything else."
+)
+
+
+@lru_cache(maxsize=1)
+def _client(api_key: str) -> openai.OpenAI:
+    """Return the shared OpenAI client so its connection pool is reused."""
+    return openai.OpenAI(
+        api_key=api_key,
+        http_client=openai.DefaultHttpxClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        ),
+    )
+
+
+def _chat(client: openai.OpenAI, prompt: str, max_tokens: int) -> str:
+    """Return the stripped text of a single chat completion."""
+    completion = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+    )
+    return completion.choices[0].message.content.strip()
+
+
+def _format_slot(value: Any) -> str:
+    if isinstance(value, int):
+        return f"{value:,}"
+    return f"{value:,.2f}"
 
 
 def generate_response(prompt: str, max_tokens: int = 60) -> str:
@@ -9,21 +90,134 @@ def generate_response(prompt: str, max_tokens: int = 60) -> str:
     if not api_key:
         return "[OpenAI API key not set] " + prompt
     try:
-        client = openai.OpenAI(api_key=api_key)
-        completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        return _chat(_client(api_key), prompt, max_tokens)
+    except Exception as e:
+        return f"[OpenAI error: {e}]"
+
+
+def generate_response_streaming(
+    prompt: str, max_tokens: int = 60, stop_on: Tuple[str, ...] = SENTENCE_STOPS
+) -> str:
+    """Return the first sentence of a streamed completion.
+
+    ``stop_on`` is passed to the API so generation halts server-side, and the
+    stream is also closed as soon as a terminator shows up in the deltas.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return "[OpenAI API key not set] " + prompt
+    try:
+        client = _client(api_key)
+        text = ""
+        finish_reason = None
+        with client.chat.completions.create(
+            model=CHAT_MODEL,
             messages=[{"role": "user", "content": prompt}],
             max_tokens=max_tokens,
-        )
-        return completion.choices[0].message.content.strip()
+            stop=list(stop_on),
+            stream=True,
+        ) as stream:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text += chunk.choices[0].delta.content or ""
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                hits = [(text.find(stop), stop) for stop in stop_on if stop in text]
+                if hits:
+                    index, stop = min(hits)
+                    text = text[:index] + stop.strip()
+                    finish_reason = "stop"
+                    break
+        text = text.strip()
+        if finish_reason == "stop" and text and text[-1] not in ".!?":
+            # The API drops the stop sequence, so restore the full stop
+            text += "."
+        return text
     except Exception as e:
         return f"[OpenAI error: {e}]"
 
 
+def generate_multi(sections: Dict[str, str], max_tokens: int = 300) -> Dict[str, str]:
+    """Answer several prompts with a single JSON-mode completion.
+
+    ``max_tokens`` budgets the answers themselves; room for the JSON wrapper
+    is added per section so a full-length reply still parses. Returns one
+    answer per key of ``sections``, or ``{}`` if the key is not set, the
+    call fails, or any section is missing from the reply.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return {}
+    prompt = (
+        "Complete each task below. Respond only with a JSON object whose keys "
+        f"are {', '.join(sections)} and whose values are the answers to the "
+        "matching tasks, each as a single string.\n\n"
+        + "\n\n".join(f"[{key}]\n{task}" for key, task in sections.items())
+    )
+    try:
+        completion = _client(api_key).chat.completions.create(
+            model=CHAT_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens + JSON_SECTION_OVERHEAD * len(sections),
+            response_format={"type": "json_object"},
+        )
+        answers = orjson.loads(completion.choices[0].message.content)
+    except Exception:
+        return {}
+    if not isinstance(answers, dict) or not all(
+        isinstance(answers.get(key), str) for key in sections
+    ):
+        return {}
+    return {key: answers[key].strip() for key in sections}
+
+
+def generate_templated_response(
+    template: str, slot_values: Dict[str, Any], max_tokens: int = 120
+) -> str:
+    """Return a completion for ``template`` filled with ``slot_values``.
+
+    Numeric slots are left as placeholders when the model is asked, and the
+    resulting skeleton is cached so later calls that only change numbers are
+    answered locally. Other slot values are part of the cache key.
+    """
+    numeric = {
+        name: _format_slot(value)
+        for name, value in slot_values.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+    fixed = {name: value for name, value in slot_values.items() if name not in numeric}
+    rendered = template.format(**fixed, **numeric)
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return generate_response(rendered, max_tokens=max_tokens)
+
+    key = _template_cache.key(template, fixed, list(numeric), max_tokens)
+    skeleton = _template_cache.get(key)
+    if skeleton is None:
+        placeholders = {name: "{" + name + "}" for name in numeric}
+        prompt = template.format(**fixed, **placeholders) + "\n" + SKELETON_INSTRUCTIONS
+        try:
+            skeleton = _chat(_client(api_key), prompt, max_tokens)
+            skeleton.format(**numeric)
+        except (KeyError, IndexError, ValueError, AttributeError):
+            # The model did not keep to the placeholders; answer this call directly.
+            return generate_response(rendered, max_tokens=max_tokens)
+        except Exception as e:
+            return f"[OpenAI error: {e}]"
+        _template_cache.put(key, skeleton)
+    return skeleton.format(**numeric)
+
+
+def to_prompt_json(value: Any) -> str:
+    """Serialize context for a prompt as compact JSON."""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def generate_json(prompt: str, max_tokens: int = 200) -> dict:
     """Return a JSON dict parsed from an OpenAI completion."""
     text = generate_response(prompt, max_tokens=max_tokens)
     try:
-        return json.loads(text)
+        return orjson.loads(text)
     except Exception:
         return {}
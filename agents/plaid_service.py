@@ -1,34 +1,89 @@
-import os
-from typing import Optional, List, Dict, Any
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple, Callable, TypeVar
 from plaid.api import plaid_api
-from plaid import Configuration, ApiClient
+from plaid import Configuration, ApiClient, ApiException
 from plaid.model.accounts_balance_get_request import AccountsBalanceGetRequest
 from plaid.model.investments_holdings_get_request import InvestmentsHoldingsGetRequest
 from plaid.model.transactions_get_request import TransactionsGetRequest
+from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
+from .config import PLAID_CLIENT_ID, PLAID_SECRET
+
+__all__ = [
+    "get_client",
+    "fetch_account_balance",
+    "fetch_investment_holdings",
+    "fetch_recent_transactions",
+    "fetch_all",
+]
+
+CONNECTION_POOL_MAXSIZE = 32
+# Largest page /transactions/get allows
+TRANSACTIONS_PAGE_SIZE = 500
+TRANSACTIONS_PAGE_WORKERS = 8
+# Rate limits and transient server errors are worth another attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.25
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 
 def get_client() -> Optional[plaid_api.PlaidApi]:
-    client_id = os.getenv("PLAID_CLIENT_ID")
-    secret = os.getenv("PLAID_SECRET")
-    if not client_id or not secret:
+    if not PLAID_CLIENT_ID or not PLAID_SECRET:
         return None
+    return _build_client(PLAID_CLIENT_ID, PLAID_SECRET)
+
+
+@lru_cache(maxsize=1)
+def _build_client(client_id: str, secret: str) -> plaid_api.PlaidApi:
+    """Create the Plaid client once so its HTTP connection pool is reused."""
     configuration = Configuration(host="https://sandbox.plaid.com", api_key={"clientId": client_id, "secret": secret})
+    # Keep enough keep-alive connections for the fetchers running concurrently
+    configuration.connection_pool_maxsize = CONNECTION_POOL_MAXSIZE
     api_client = ApiClient(configuration)
     return plaid_api.PlaidApi(api_client)
 
 
+def _with_retry(call: Callable[[], T]) -> T:
+    """Run a Plaid request, retrying retryable failures with exponential backoff."""
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return call()
+        except ApiException as e:
+            if e.status not in RETRY_STATUSES or attempt == RETRY_ATTEMPTS - 1:
+                raise
+            time.sleep(RETRY_BASE_DELAY * 2 ** attempt + random.random() * 0.05)
+
+
+def _log_failure(request: str, error: Exception) -> None:
+    """Log a failed fetch in one line; the traceback is only logged at DEBUG."""
+    reason = error.status if isinstance(error, ApiException) else error
+    logger.warning(
+        "Plaid %s request failed: %s", request, reason,
+        exc_info=logger.isEnabledFor(logging.DEBUG),
+    )
+
+
 def fetch_account_balance(access_token: str) -> Optional[float]:
     client = get_client()
     if not client:
         return None
     try:
         request = AccountsBalanceGetRequest(access_token=access_token)
-        response = client.accounts_balance_get(request)
-        accounts = response["accounts"]
-        if not accounts:
+        response = _with_retry(lambda: client.accounts_balance_get(request))
+        if not response.accounts:
             return None
-        return accounts[0]["balances"].get("available") or accounts[0]["balances"].get("current")
-    except Exception:
+        balances = response.accounts[0].balances
+        return balances.available if balances.available is not None else balances.current
+    except Exception as e:
+        _log_failure("balance", e)
         return None
 
 
@@ -39,7 +94,7 @@ def fetch_investment_holdings(access_token: str) -> Optional[List[Dict[str, Any]
         return None
     try:
         request = InvestmentsHoldingsGetRequest(access_token=access_token)
-        response = client.investments_holdings_get(request)
+        response = _with_retry(lambda: client.investments_holdings_get(request))
         holdings = []
         securities = {s["security_id"]: s for s in response.get("securities", [])}
         for h in response.get("holdings", []):
@@ -53,26 +108,71 @@ def fetch_investment_holdings(access_token: str) -> Optional[List[Dict[str, Any]
                 "type": sec.get("type")
             })
         return holdings
-    except Exception:
+    except Exception as e:
+        _log_failure("holdings", e)
         return None
 
 
 def fetch_recent_transactions(access_token: str, start_date: str, end_date: str) -> Optional[List[Dict[str, Any]]]:
-    """Fetch recent transactions within the date range."""
+    """Fetch all transactions within the ISO date range.
+
+    The first page reports the total count; any remaining pages are then
+    requested concurrently."""
     client = get_client()
     if not client:
         return None
     try:
-        request = TransactionsGetRequest(access_token=access_token, start_date=start_date, end_date=end_date)
-        response = client.transactions_get(request)
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+
+        def fetch_page(offset: int):
+            request = TransactionsGetRequest(
+                access_token=access_token,
+                start_date=start,
+                end_date=end,
+                options=TransactionsGetRequestOptions(count=TRANSACTIONS_PAGE_SIZE, offset=offset),
+            )
+            return _with_retry(lambda: client.transactions_get(request))
+
+        first = fetch_page(0)
+        pages = [first.get("transactions", [])]
+        offsets = range(TRANSACTIONS_PAGE_SIZE, first.get("total_transactions", 0), TRANSACTIONS_PAGE_SIZE)
+        if offsets:
+            with ThreadPoolExecutor(max_workers=TRANSACTIONS_PAGE_WORKERS) as executor:
+                pages.extend(response.get("transactions", []) for response in executor.map(fetch_page, offsets))
         txs = []
-        for tx in response.get("transactions", []):
-            txs.append({
-                "name": tx.get("name"),
-                "amount": tx.get("amount"),
-                "date": tx.get("date"),
-                "category": tx.get("category")
-            })
+        for page in pages:
+            for tx in page:
+                txs.append({
+                    "name": tx.get("name"),
+                    "amount": tx.get("amount"),
+                    "date": tx.get("date"),
+                    "category": tx.get("category")
+                })
         return txs
-    except Exception:
+    except Exception as e:
+        _log_failure("transactions", e)
         return None
+
+
+def fetch_all(
+    access_token: str,
+    include_holdings: bool = False,
+    transactions_window: Optional[Tuple[str, str]] = None,
+) -> Tuple[Optional[float], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Fetch balance, holdings and transactions concurrently.
+
+    Holdings are only requested with ``include_holdings`` and transactions
+    only when a ``(start_date, end_date)`` window is given; skipped or failed
+    lists come back empty."""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        balance = executor.submit(fetch_account_balance, access_token)
+        holdings = executor.submit(fetch_investment_holdings, access_token) if include_holdings else None
+        transactions = (
+            executor.submit(fetch_recent_transactions, access_token, *transactions_window)
+            if transactions_window else None
+        )
+    return (
+        balance.result(),
+        (holdings.result() if holdings else None) or [],
+        (transactions.result() if transactions else None) or [],
+    )
@@ -3,8 +3,25 @@ from typing import Dict, Any, List
 import re
 from .openai_utils import generate_json
 
-from dotenv import load_dotenv
-load_dotenv(override=True)
+# Patterns are lowercase and matched against the already lowercased input
+MONEY_RE = re.compile(r'\$?(\d+(?:,\d{3})*(?:\.\d{2})?)')
+TIME_RE = re.compile(r'(\d+)\s*(month|year|week|day)s?')
+RISK_RES = [
+    ("low", re.compile(r"low risk|conservative|cautious")),
+    ("medium", re.compile(r"medium risk|moderate")),
+    ("high", re.compile(r"high risk|aggressive")),
+]
+GOAL_RES = [
+    ("retirement", re.compile(r"retire|retirement")),
+    ("buy_home", re.compile(r"house|home|down payment")),
+    ("emergency_fund", re.compile(r"emergency fund|rainy day|safety net")),
+]
+ESG_RE = re.compile(r"esg|ethical|sustainable|socially responsible|green")
+HOLDINGS_RE = re.compile(r"holdings|portfolio|existing investments")
+EXPENSES_RE = re.compile(r"expenses|recurring bills|fixed costs")
+OVERRIDE_RE = re.compile(r"(rent|utilities)\s*\$?(\d+(?:,\d{3})*(?:\.\d+)?)")
+CONFIRM_RE = re.compile(r"invest now|execute|confirm|do it|deposit")
+EXPLAIN_RE = re.compile(r"explain|eli5|simple|understand|clarify|break down|help me|what does")
 
 class PlannerAgent:
     def __init__(self):
@@ -26,16 +43,25 @@ class PlannerAgent:
                 r"job loss|career change|emergency"
             ]
         }
+        # One alternation per query type so each type is a single scan
+        self._category_res = {
+            query_type: re.compile("|".join(f"(?:{p})" for p in patterns))
+            for query_type, patterns in self.query_patterns.items()
+        }
     
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Analyzes query and determines routing strategy"""
-        user_input = state.get("input", "").lower()
+        user_input = state.get("input_lower") or state.get("input", "").lower()
+
+        # Match every category once; classification and multi-agent routing
+        # both read from this list
+        matched_types = self._match_query_types(user_input)
 
         # Determine query type
-        query_type = self._classify_query(user_input)
+        query_type = self._classify_query(matched_types)
 
         # Extract context and parameters from the input
-        context = self._extract_context(user_input, query_type)
+        context = self._extract_context(user_input, query_type, matched_types)
 
         # Merge any pre-existing context from the state (e.g. user profile)
         existing_context = state.get("context", {}) or {}
@@ -56,89 +82,83 @@ class PlannerAgent:
             "simulation_params": simulation_params,
         }
     
-    def _classify_query(self, user_input: str) -> str:
+    def _match_query_types(self, user_input: str) -> List[str]:
+        """Returns every category matching the query, in priority order"""
+        return [
+            query_type
+            for query_type, category_re in self._category_res.items()
+            if category_re.search(user_input)
+        ]
+
+    def _classify_query(self, matched_types: List[str]) -> str:
         """Classifies the user query into appropriate category"""
-        for query_type, patterns in self.query_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, user_input, re.IGNORECASE):
-                    return query_type
-        
-        return "general"
+        return matched_types[0] if matched_types else "general"
     
-    def _extract_context(self, user_input: str, query_type: str) -> Dict[str, Any]:
+    def _extract_context(
+        self, user_input: str, query_type: str, matched_types: List[str]
+    ) -> Dict[str, Any]:
         """Extracts relevant context from the user input"""
         context = {"requires_multiple_agents": False}
         
         # Check for monetary amounts
         # Updated regex to capture values like "$5000" by allowing more digits
-        money_pattern = r'\$?(\d+(?:,\d{3})*(?:\.\d{2})?)'
-        money_matches = re.findall(money_pattern, user_input)
-        if money_matches:
-            context["amount"] = money_matches[0].replace(",", "")
+        money_match = MONEY_RE.search(user_input)
+        if money_match:
+            context["amount"] = money_match.group(1).replace(",", "")
         
         # Check for time references
-        time_pattern = r'(\d+)\s*(month|year|week|day)s?'
-        time_matches = re.findall(time_pattern, user_input, re.IGNORECASE)
-        if time_matches:
-            context["timeframe"] = time_matches[0]
+        time_match = TIME_RE.search(user_input)
+        if time_match:
+            context["timeframe"] = time_match.groups()
 
         # Risk tolerance
-        if re.search(r"low risk|conservative|cautious", user_input, re.IGNORECASE):
-            context["risk_tolerance"] = "low"
-        elif re.search(r"medium risk|moderate", user_input, re.IGNORECASE):
-            context["risk_tolerance"] = "medium"
-        elif re.search(r"high risk|aggressive", user_input, re.IGNORECASE):
-            context["risk_tolerance"] = "high"
+        for risk, risk_re in RISK_RES:
+            if risk_re.search(user_input):
+                context["risk_tolerance"] = risk
+                break
 
         # Investment goals
-        if re.search(r"retire|retirement", user_input, re.IGNORECASE):
-            context["goal"] = "retirement"
-        elif re.search(r"house|home|down payment", user_input, re.IGNORECASE):
-            context["goal"] = "buy_home"
-        elif re.search(r"emergency fund|rainy day|safety net", user_input, re.IGNORECASE):
-            context["goal"] = "emergency_fund"
+        for goal, goal_re in GOAL_RES:
+            if goal_re.search(user_input):
+                context["goal"] = goal
+                break
 
         # ESG preference
-        if re.search(r"esg|ethical|sustainable|socially responsible|green", user_input, re.IGNORECASE):
+        if ESG_RE.search(user_input):
             context["esg"] = True
 
         # Include holdings or expenses based on keywords
-        if re.search(r"holdings|portfolio|existing investments", user_input, re.IGNORECASE):
+        if HOLDINGS_RE.search(user_input):
             context["include_holdings"] = True
-        if re.search(r"expenses|recurring bills|fixed costs", user_input, re.IGNORECASE):
+        if EXPENSES_RE.search(user_input):
             context["include_expenses"] = True
 
         # Simple overrides for common expenses
         overrides = {}
-        for name in ["rent", "utilities"]:
-            match = re.search(fr"{name}\s*\$?(\d+(?:,\d{3})*(?:\.\d+)?)", user_input, re.IGNORECASE)
-            if match:
-                overrides[name.capitalize()] = float(match.group(1).replace(",", ""))
+        for match in OVERRIDE_RE.finditer(user_input):
+            # The first amount given for each expense wins
+            overrides.setdefault(
+                match.group(1).capitalize(), float(match.group(2).replace(",", ""))
+            )
         if overrides:
             context["override_fixed_expenses"] = overrides
 
 
         # Determine if multiple agents might be needed
-        if len([qt for qt in self.query_patterns.keys()
-                if any(re.search(p, user_input, re.IGNORECASE)
-                      for p in self.query_patterns[qt])]) > 1:
+        if len(matched_types) > 1:
             context["requires_multiple_agents"] = True
 
         # Check if user confirmed executing an investment action
-        confirm_keywords = ["invest now", "execute", "confirm", "do it", "deposit"]
-        if any(kw in user_input for kw in confirm_keywords):
+        if CONFIRM_RE.search(user_input):
             context["execute_plaid"] = True
 
         return context
     
     def _needs_explanation(self, user_input: str) -> bool:
-        """Determines if the response needs to be explained in simple terms"""
-        explanation_keywords = [
-            "explain", "eli5", "simple", "understand", "clarify", 
-            "break down", "help me", "what does"
-        ]
-        
-        return any(keyword in user_input.lower() for keyword in explanation_keywords)
+        """Determines if the response needs to be explained in simple terms
+
+        Expects the lowercased input from ``process``."""
+        return bool(EXPLAIN_RE.search(user_input))
     
     def _extract_simulation_params(self, user_input: str) -> Dict[str, Any]:
         """Extracts parameters for simulation scenarios"""
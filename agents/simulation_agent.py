@@ -1,7 +1,38 @@
 """Simple scenario simulation logic."""
 
-from typing import Dict, Any
-from .openai_utils import generate_response
+import threading
+from typing import Dict, Any, Optional, Tuple
+from cachetools import LRUCache
+from .openai_utils import generate_response, to_prompt_json
+
+# Returned without calling the model when there is nothing specific to simulate
+GENERIC_SIMULATION = (
+    "Describe a scenario such as a job loss, an emergency or a market crash, "
+    "and optionally a timeframe, to see its financial impact."
+)
+
+# The description only depends on (scenario, timeframe), so reuse it
+_simulations: LRUCache = LRUCache(maxsize=64)
+_simulations_lock = threading.Lock()
+
+
+def _simulate(scenario: str, timeframe: Optional[Tuple[str, ...]]) -> str:
+    """Return the model's description of a scenario, cached per process."""
+    key = (scenario, timeframe)
+    with _simulations_lock:
+        desc = _simulations.get(key)
+    if desc is None:
+        prompt = (
+            "Briefly describe the financial impact of a "
+            f"{scenario} scenario. If a timeframe is provided include it.\n"
+            f"Timeframe: {to_prompt_json(timeframe)}"
+        )
+        desc = generate_response(prompt, max_tokens=80)
+        # Errors and missing-key placeholders are not cached
+        if not desc.startswith("[OpenAI"):
+            with _simulations_lock:
+                _simulations[key] = desc
+    return desc
 
 
 class SimulationAgent:
@@ -11,15 +42,14 @@ class SimulationAgent:
         params = state.get("simulation_params", {}) or {}
         context = state.get("context", {}) or {}
         timeframe = context.get("timeframe")
+        timeframe = tuple(timeframe) if timeframe else None
 
         scenario = params.get("scenario_type", "generic")
 
-        prompt = (
-            "Briefly describe the financial impact of a "
-            f"{scenario} scenario. If a timeframe is provided include it.\n"
-            f"Timeframe: {timeframe}"
-        )
-        desc = generate_response(prompt, max_tokens=80)
+        if scenario == "generic" and timeframe is None:
+            desc = GENERIC_SIMULATION
+        else:
+            desc = _simulate(scenario, timeframe)
 
         return {
             "result": desc,
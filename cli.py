@@ -1,5 +1,12 @@
+import argparse
+import asyncio
+from typing import Any, Dict, List, Optional
+
 from graph import graph
 
+# Upper bound on graph runs in flight during a batch replay
+BATCH_CONCURRENCY = 10
+
 
 def gather_profile():
     print("Welcome to FinLife Navigator CLI")
@@ -21,25 +28,30 @@ def gather_profile():
     }
 
 
+def build_initial_state(user_input: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "input": user_input,
+        "input_lower": user_input.lower(),
+        "query_type": None,
+        "context": profile,
+        "intermediate_results": [],
+        "final_result": "",
+        "confidence_score": None,
+        "requires_explanation": False,
+        "simulation_params": None,
+    }
+
+
 def run_cli():
     profile = gather_profile()
     print("\nType 'exit' to quit.\n")
     while True:
         user_input = input("You: ").strip()
-        if user_input.lower() in {"exit", "quit"}:
+        lowered = user_input.lower()
+        if lowered in {"exit", "quit"}:
             print("Goodbye!")
             break
-        initial_state = {
-            "input": user_input,
-            "query_type": None,
-            "context": profile,
-            "intermediate_results": [],
-            "final_result": "",
-            "confidence_score": None,
-            "requires_explanation": False,
-            "simulation_params": None,
-        }
-        final_state = graph.invoke(initial_state)
+        final_state = graph.invoke(build_initial_state(user_input, profile))
         output = final_state.get("final_result", "")
         print(f"Assistant: {output}")
         # Debug: show state if no result
@@ -50,5 +62,46 @@ def run_cli():
         print()
 
 
+async def run_batch(
+    inputs: List[str],
+    profile: Optional[Dict[str, Any]] = None,
+    max_concurrency: int = BATCH_CONCURRENCY,
+) -> List[str]:
+    """Run each input through the graph concurrently and return the answers.
+
+    Every graph run is blocking, so each one goes to a worker thread and at
+    most ``max_concurrency`` of them are in flight at a time. Answers are
+    returned in the order of ``inputs``."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(user_input: str) -> str:
+        async with semaphore:
+            final_state = await asyncio.to_thread(
+                graph.invoke, build_initial_state(user_input, profile or {})
+            )
+        return final_state.get("final_result", "")
+
+    return await asyncio.gather(*(run_one(user_input) for user_input in inputs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FinLife Navigator CLI")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="answer each non-empty line of FILE instead of starting a session",
+    )
+    args = parser.parse_args()
+    if not args.batch:
+        run_cli()
+        return
+    with open(args.batch, encoding="utf-8") as f:
+        inputs = [line.strip() for line in f if line.strip()]
+    for user_input, output in zip(inputs, asyncio.run(run_batch(inputs))):
+        print(f"You: {user_input}")
+        print(f"Assistant: {output}")
+        print()
+
+
 if __name__ == "__main__":
-    run_cli()
+    main()
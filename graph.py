@@ -1,4 +1,5 @@
 # graph.py
+from concurrent.futures import ThreadPoolExecutor
 from langgraph.graph import StateGraph, START, END
 from typing import TypedDict, List, Optional, Any
 from agents.planner import PlannerAgent
@@ -7,9 +8,11 @@ from agents.budget_optimizer_agent import BudgetOptimizerAgent
 from agents.investment_agent import InvestmentAgent
 from agents.explainer_agent import ExplainerAgent
 from agents.simulation_agent import SimulationAgent
+from agents.openai_utils import generate_multi
 
 class AgentState(TypedDict):
     input: str
+    input_lower: Optional[str]
     query_type: Optional[str]
     context: Optional[dict]
     intermediate_results: List[dict]
@@ -17,6 +20,7 @@ class AgentState(TypedDict):
     confidence_score: Optional[float]
     requires_explanation: bool
     simulation_params: Optional[dict]
+    explanation: Optional[str]
 
 class FinLifeNavigator:
     def __init__(self):
@@ -26,6 +30,14 @@ class FinLifeNavigator:
         self.investment_agent = InvestmentAgent()
         self.explainer_agent = ExplainerAgent()
         self.simulation_agent = SimulationAgent()
+
+        # Agents answered together when a query of this type needs several
+        self.agent_groups = {
+            "life_event": {
+                "life_event": self.life_event_agent,
+                "budget": self.budget_optimizer,
+            },
+        }
         
         self.workflow = self._build_graph()
         self.graph = self.workflow.compile()
@@ -42,6 +54,7 @@ class FinLifeNavigator:
         workflow.add_node("investment_agent", self._investment_node)
         workflow.add_node("simulation_agent", self._simulation_node)
         workflow.add_node("explainer_agent", self._explainer_node)
+        workflow.add_node("parallel_agents", self._parallel_agents_node)
         
         # Add coordinator node for multi-agent scenarios
         workflow.add_node("coordinator", self._coordinator_node)
@@ -58,6 +71,7 @@ class FinLifeNavigator:
                 "budget_optimizer_agent": "budget_optimizer_agent",
                 "investment_agent": "investment_agent",
                 "simulation_agent": "simulation_agent",
+                "parallel_agents": "parallel_agents",
                 "coordinator": "coordinator"
             }
         )
@@ -67,6 +81,7 @@ class FinLifeNavigator:
         workflow.add_edge("budget_optimizer_agent", "coordinator")
         workflow.add_edge("investment_agent", "coordinator")
         workflow.add_edge("simulation_agent", "coordinator")
+        workflow.add_edge("parallel_agents", "coordinator")
         
         # Conditional routing from coordinator
         workflow.add_conditional_edges(
@@ -129,18 +144,38 @@ class FinLifeNavigator:
             "confidence_score": result.get("confidence_score")
         }
     
+    def _parallel_agents_node(self, state: AgentState) -> AgentState:
+        """Answers a group of independent agents with one coalesced request"""
+        agents = self.agent_groups[state.get("query_type")]
+        prompts = {name: agent.build_prompt(state) for name, agent in agents.items()}
+        sections = {name: prompt for name, prompt in prompts.items() if prompt is not None}
+        # An agent without a prompt could only ask for more details, which
+        # would trail the other answers, so it is left out of the group
+        # unless no agent has anything to answer
+        active = {name: agents[name] for name in sections} or agents
+        max_tokens = sum(agents[name].max_tokens for name in sections)
+        if sections and state.get("requires_explanation", False):
+            sections["explanation"] = self.explainer_agent.combined_task
+            max_tokens += self.explainer_agent.max_tokens
+
+        answers = generate_multi(sections, max_tokens=max_tokens) if sections else {}
+        if answers:
+            results = [agent.format_result(answers[name], state) for name, agent in active.items()]
+        else:
+            # Fall back to one request per agent, still issued concurrently
+            with ThreadPoolExecutor(max_workers=len(active)) as executor:
+                results = list(executor.map(lambda agent: agent.process(state), active.values()))
+        return {
+            **state,
+            "intermediate_results": state.get("intermediate_results", []) + results,
+            "confidence_score": results[0].get("confidence_score"),
+            "explanation": answers.get("explanation"),
+        }
+
     def _coordinator_node(self, state: AgentState) -> AgentState:
         """Coordinates results from multiple agents"""
         intermediate_results = state.get("intermediate_results", [])
 
-        # Example of running an additional agent when multiple agents are needed
-        if state.get("context", {}).get("requires_multiple_agents") and state.get(
-            "query_type"
-        ) == "life_event" and len(intermediate_results) == 1:
-            # Invoke budget optimizer as a secondary step
-            result = self.budget_optimizer.process(state)
-            intermediate_results.append(result)
-
         if len(intermediate_results) == 1:
             final_result = intermediate_results[0].get("result", "")
         else:
@@ -154,6 +189,9 @@ class FinLifeNavigator:
     
     def _explainer_node(self, state: AgentState) -> AgentState:
         """Converts technical outputs to user-friendly explanations"""
+        if state.get("explanation"):
+            # Already produced alongside the agents' answers
+            return {**state, "final_result": state["explanation"]}
         result = self.explainer_agent.process(state)
         return {
             **state,
@@ -165,11 +203,11 @@ class FinLifeNavigator:
         query_type = state.get("query_type", "general")
         context = state.get("context", {})
         
-        # Check if multiple agents are needed. In this toy example we simply
-        # start with one agent and let the coordinator trigger others.
+        # Check if multiple agents are needed. Known combinations run
+        # side by side; otherwise start with one agent.
         if context.get("requires_multiple_agents"):
-            if query_type == "life_event":
-                return "life_event_agent"
+            if query_type in self.agent_groups:
+                return "parallel_agents"
             if query_type == "budget_optimization":
                 return "budget_optimizer_agent"
             return "coordinator"